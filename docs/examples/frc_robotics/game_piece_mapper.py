@@ -16,14 +16,24 @@ Example:
 """
 
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Set, Tuple
 
 import sys
 sys.path.insert(0, '.')
 
+try:
+    import ahocorasick  # pyahocorasick (optional)
+except ImportError:
+    ahocorasick = None
+
 from rag_bench.modules.base import QueryPreprocessor, ModuleConfig
 
 
+def _is_word_char(ch: str) -> bool:
+    """Match the regex \\w class used for word boundaries."""
+    return ch.isalnum() or ch == "_"
+
+
 class GamePieceMapperPreprocessor(QueryPreprocessor):
     """
     Maps generic game piece terms to FRC-specific terminology.
@@ -157,6 +167,49 @@ class GamePieceMapperPreprocessor(QueryPreprocessor):
             
             for synonym in piece_data.get("synonyms", []):
                 self.synonym_to_piece[synonym.lower()] = piece_id
+        
+        # Match every synonym and generic term in one pass over the query with
+        # an Aho-Corasick automaton; fall back to precompiled patterns if
+        # pyahocorasick isn't installed
+        self._automaton = None
+        self._generic_patterns: List[Tuple[str, re.Pattern]] = []
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for term in set(self.synonym_to_piece) | set(self.generic_to_pieces):
+                self._automaton.add_word(
+                    term,
+                    (term, term in self.synonym_to_piece, term in self.generic_to_pieces),
+                )
+            self._automaton.make_automaton()
+        else:
+            self._generic_patterns = [
+                # Terms and queries are both lowercased, so no IGNORECASE
+                (generic_term, re.compile(r"\b" + re.escape(generic_term) + r"\b"))
+                for generic_term in self.generic_to_pieces
+            ]
+    
+    def _match_terms(self, query_lower: str) -> Tuple[Set[str], Set[str]]:
+        """
+        Find the synonyms (substring match) and generic terms (whole-word
+        match) present in a lowercased query.
+        """
+        if self._automaton is None:
+            synonyms = {s for s in self.synonym_to_piece if s in query_lower}
+            generics = {t for t, pattern in self._generic_patterns if pattern.search(query_lower)}
+            return synonyms, generics
+        
+        synonyms: Set[str] = set()
+        generics: Set[str] = set()
+        for end, (term, is_synonym, is_generic) in self._automaton.iter(query_lower):
+            if is_synonym:
+                synonyms.add(term)
+            if is_generic:
+                start = end - len(term) + 1
+                if (start == 0 or not _is_word_char(query_lower[start - 1])) and (
+                    end + 1 == len(query_lower) or not _is_word_char(query_lower[end + 1])
+                ):
+                    generics.add(term)
+        return synonyms, generics
     
     def process(self, query: str, context: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
         """
@@ -171,20 +224,24 @@ class GamePieceMapperPreprocessor(QueryPreprocessor):
         """
         query_lower = query.lower()
         matched_pieces: List[str] = []
+        matched_set: Set[str] = set()
         expansions: List[str] = []
         
+        matched_synonyms, matched_generics = self._match_terms(query_lower)
+        
         # Check for synonym matches
         for synonym, piece_id in self.synonym_to_piece.items():
-            if synonym in query_lower:
-                if piece_id not in matched_pieces:
+            if synonym in matched_synonyms:
+                if piece_id not in matched_set:
+                    matched_set.add(piece_id)
                     matched_pieces.append(piece_id)
         
         # Check for generic term matches
         for generic_term, piece_ids in self.generic_to_pieces.items():
-            pattern = r"\b" + re.escape(generic_term) + r"\b"
-            if re.search(pattern, query_lower, re.IGNORECASE):
+            if generic_term in matched_generics:
                 for pid in piece_ids:
-                    if pid not in matched_pieces:
+                    if pid not in matched_set:
+                        matched_set.add(pid)
                         matched_pieces.append(pid)
                         piece_data = self.GAME_PIECES[pid]
                         expansion = f"{piece_data['official_name']} {piece_data['season']}"
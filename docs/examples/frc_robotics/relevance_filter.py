@@ -9,13 +9,23 @@ FRC technical terms and demoting generic or off-topic documents.
 """
 
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Set, Tuple
 
 import sys
 sys.path.insert(0, '.')
 
+try:
+    import ahocorasick  # pyahocorasick (optional)
+except ImportError:
+    ahocorasick = None
+
 from rag_bench.modules.base import RelevanceFilter, ModuleConfig
 
+_WORD_RE = re.compile(r"\b\w+\b")
+
+# Distinct tokens remembered by the per-token keyword cache before it is reset
+_TOKEN_CACHE_MAX = 100_000
+
 
 class FRCRelevanceFilter(RelevanceFilter):
     """
@@ -105,6 +115,52 @@ class FRCRelevanceFilter(RelevanceFilter):
         self.high_weight = config.get("high_value_weight", 3.0)
         self.medium_weight = config.get("medium_value_weight", 2.0)
         self.rerank_only = config.get("rerank_only", False)
+        
+        # Keywords are matched as plain substrings. They are all word
+        # characters, so every hit lies inside one \w+ token: scan each
+        # distinct token once and cache the keywords it contains. Overlapping
+        # hits must all be reported: use an Aho-Corasick automaton if
+        # pyahocorasick is installed, else a zero-width lookahead alternation
+        # (exact here because no keyword is a prefix of another).
+        self._keyword_class = {kw: "high" for kw in self.HIGH_VALUE_KEYWORDS}
+        self._keyword_class.update({kw: "medium" for kw in self.MEDIUM_VALUE_KEYWORDS})
+        self._token_keywords: Dict[str, Tuple[str, ...]] = {}
+        self._automaton = None
+        self._keyword_re = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self._keyword_class:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+        else:
+            alternation = "|".join(map(re.escape, sorted(self._keyword_class, key=len, reverse=True)))
+            self._keyword_re = re.compile(f"(?=({alternation}))")
+    
+    def _keywords_in_token(self, token: str) -> Tuple[str, ...]:
+        """FRC keywords occurring anywhere in a lowercased token (cached)."""
+        found = self._token_keywords.get(token)
+        if found is None:
+            if self._automaton is not None:
+                found = tuple({kw for _, kw in self._automaton.iter(token)})
+            else:
+                found = tuple({m.group(1) for m in self._keyword_re.finditer(token)})
+            if len(self._token_keywords) >= _TOKEN_CACHE_MAX:
+                self._token_keywords.clear()
+            self._token_keywords[token] = found
+        return found
+    
+    def _count_keywords(self, doc_words: Set[str]) -> Tuple[int, int]:
+        """Count distinct high- and medium-value keywords present in a document's word set."""
+        found = set()
+        for token in doc_words:
+            found.update(self._keywords_in_token(token))
+        high = sum(1 for kw in found if self._keyword_class[kw] == "high")
+        return high, len(found) - high
+    
+    def _precompute_query(self, query: str) -> Tuple[str, Set[str]]:
+        """Lowercased query and its word set, shared by every document scored against it."""
+        query_lower = query.lower()
+        return query_lower, set(_WORD_RE.findall(query_lower))
     
     def _calculate_relevance_score(self, query: str, document: str) -> float:
         """
@@ -117,28 +173,31 @@ class FRCRelevanceFilter(RelevanceFilter):
         Returns:
             Relevance score between 0 and 1
         """
-        query_lower = query.lower()
+        query_lower, query_words = self._precompute_query(query)
+        return self._score_doc_precomputed(query_lower, query_words, document)
+    
+    def _score_doc_precomputed(self, query_lower: str, query_words: Set[str], document: str) -> float:
+        """Same as `_calculate_relevance_score`, with the query already tokenized."""
         doc_lower = document.lower()
         
-        # Word overlap score
-        query_words = set(re.findall(r"\b\w+\b", query_lower))
-        doc_words = set(re.findall(r"\b\w+\b", doc_lower))
-        overlap = len(query_words.intersection(doc_words))
+        # Word overlap score; the word set also feeds the FRC keyword count
+        doc_tokens = _WORD_RE.findall(doc_lower)
+        doc_words = set(doc_tokens)
+        overlap = len(query_words & doc_words)
         keyword_score = overlap / len(query_words) if query_words else 0.0
         
-        # FRC keyword score
-        high_matches = sum(1 for kw in self.HIGH_VALUE_KEYWORDS if kw in doc_lower)
-        medium_matches = sum(1 for kw in self.MEDIUM_VALUE_KEYWORDS if kw in doc_lower)
-        frc_score = (high_matches * self.high_weight + medium_matches * self.medium_weight) / 100.0
-        
         # Document length penalty
-        doc_length = len(document.split())
+        doc_length = len(doc_tokens)
         length_penalty = 1.0
         if doc_length < 50:
             length_penalty = 0.7
         elif doc_length > 1000:
             length_penalty = 0.8
         
+        # FRC keyword score
+        high_matches, medium_matches = self._count_keywords(doc_words)
+        frc_score = (high_matches * self.high_weight + medium_matches * self.medium_weight) / 100.0
+        
         # Combined score
         relevance_score = (keyword_score * 0.5 + frc_score * 0.5) * length_penalty
         return min(relevance_score, 1.0)
@@ -164,10 +223,11 @@ class FRCRelevanceFilter(RelevanceFilter):
             return documents, context
         
         # Score all documents
+        query_lower, query_words = self._precompute_query(query)
         scored_docs = []
         for doc in documents:
             content = doc.get("content", "")
-            score = self._calculate_relevance_score(query, content)
+            score = self._score_doc_precomputed(query_lower, query_words, content)
             scored_docs.append((doc, score))
         
         # Filter by minimum score (unless rerank_only)
@@ -12,7 +12,7 @@ import os
 import sys
 import time
 import glob
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from dataclasses import asdict
 
 try:
@@ -23,8 +23,12 @@ except ImportError:
 
 # Add project root to path for module imports
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+python_root = os.path.join(project_root, "python")
+for path in (project_root, python_root):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from text_rag.progress import ProgressWriter
 
 try:
     from rag_bench.modules import get_registry
@@ -40,6 +44,10 @@ except ImportError:
 # 4. Generate embeddings
 # 5. Store in Chroma with metadata
 
+# Per-PDF cap on excluded images reported in full; the rest are only counted
+MAX_EXCLUDED_TRACKED = 1000
+
+
 def load_config(config_path: str) -> Dict[str, Any]:
     """Load image embedding configuration."""
     with open(config_path, 'r', encoding='utf-8') as f:
@@ -54,46 +62,45 @@ def extract_page_text(page, start_char: int = 0, end_char: Optional[int] = None)
     return text[start_char:]
 
 
-def extract_context_around_image(
-    pdf_path: str,
-    page_num: int,
-    image_bbox: Dict[str, float],
-    config: Dict[str, Any]
-) -> str:
-    """Extract surrounding text context for an image."""
-    pdf = fitz.open(pdf_path)
-    try:
-        page = pdf[page_num - 1]  # 0-indexed
-        
-        if config.get('contextSource') == 'none' or not config.get('includeContext', True):
-            return ""
-        
-        context_chars = config.get('contextChars', 500)
-        
-        # Get all text on the page
-        page_text = page.get_text()
-        
-        # For simplicity, extract text before/after based on image position
-        # In a real implementation, you'd extract text based on bbox coordinates
-        if config.get('contextSource') == 'before':
-            # Extract text before image (approximate)
-            return page_text[:context_chars]
-        elif config.get('contextSource') == 'after':
-            # Extract text after image (approximate)
-            return page_text[-context_chars:] if len(page_text) > context_chars else page_text
-        elif config.get('contextSource') == 'both':
-            # Extract text around image
-            mid = len(page_text) // 2
-            start = max(0, mid - context_chars // 2)
-            end = min(len(page_text), mid + context_chars // 2)
-            return page_text[start:end]
-        elif config.get('contextSource') == 'page':
-            # Extract all page text
-            return page_text[:context_chars] if len(page_text) > context_chars else page_text
-        else:
-            return ""
-    finally:
-        pdf.close()
+def open_pdf(pdf_path: str) -> "fitz.Document":
+    """
+    Open a PDF from a single sequential read of the file.
+
+    PyMuPDF then serves all page/image access from memory instead of issuing
+    random reads against the file, which is much cheaper on network or FUSE
+    filesystems.
+    """
+    with open(pdf_path, "rb") as f:
+        data = f.read()
+    return fitz.open(stream=data, filetype="pdf")
+
+
+def context_from_page_text(page_text: str, config: Dict[str, Any]) -> str:
+    """Slice the configured context window out of already-extracted page text."""
+    if config.get('contextSource') == 'none' or not config.get('includeContext', True):
+        return ""
+    
+    context_chars = config.get('contextChars', 500)
+    
+    # For simplicity, extract text before/after based on image position
+    # In a real implementation, you'd extract text based on bbox coordinates
+    if config.get('contextSource') == 'before':
+        # Extract text before image (approximate)
+        return page_text[:context_chars]
+    elif config.get('contextSource') == 'after':
+        # Extract text after image (approximate)
+        return page_text[-context_chars:] if len(page_text) > context_chars else page_text
+    elif config.get('contextSource') == 'both':
+        # Extract text around image
+        mid = len(page_text) // 2
+        start = max(0, mid - context_chars // 2)
+        end = min(len(page_text), mid + context_chars // 2)
+        return page_text[start:end]
+    elif config.get('contextSource') == 'page':
+        # Extract all page text
+        return page_text[:context_chars] if len(page_text) > context_chars else page_text
+    else:
+        return ""
 
 
 def get_image_filters(config: Dict[str, Any]) -> List[Any]:
@@ -110,32 +117,32 @@ def get_image_filters(config: Dict[str, Any]) -> List[Any]:
         return []
 
 
-def should_exclude_image(
-    image: Dict[str, Any],
-    context: Dict[str, Any],
-    filters: List[Any]
-) -> Tuple[bool, Dict[str, Any]]:
+def build_filter_chain(filters: List[Any]) -> Callable[[Dict[str, Any], Dict[str, Any]], Tuple[bool, Dict[str, Any]]]:
     """
-    Check if an image should be excluded using all enabled filters.
+    Bind the enabled filters into a single exclusion check.
+    
+    Each filter's `should_exclude` method and MODULE_ID are looked up once
+    here instead of once per image.
     
     Returns:
-        (should_exclude, exclusion_metadata)
+        Function (image, context) -> (should_exclude, exclusion_metadata)
     """
-    if not filters:
-        return False, {}
+    bound = tuple((f.MODULE_ID, f.should_exclude) for f in filters)
     
-    exclusion_metadata = {}
-    for filter_instance in filters:
-        try:
-            should_exclude, reason = filter_instance.should_exclude(image, context)
+    def run(image: Dict[str, Any], context: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        for filter_id, check in bound:
+            try:
+                should_exclude, reason = check(image, context)
+            except Exception as e:
+                print(f"WARNING: Image filter '{filter_id}' failed: {e}", file=sys.stderr)
+                continue
             if should_exclude:
-                exclusion_metadata.update(reason)
-                exclusion_metadata["filter_id"] = filter_instance.MODULE_ID
+                exclusion_metadata = dict(reason)
+                exclusion_metadata["filter_id"] = filter_id
                 return True, exclusion_metadata
-        except Exception as e:
-            print(f"WARNING: Image filter '{filter_instance.MODULE_ID}' failed: {e}", file=sys.stderr)
+        return False, {}
     
-    return False, {}
+    return run
 
 
 def process_pdf(
@@ -145,17 +152,21 @@ def process_pdf(
     filters: Optional[List[Any]] = None
 ) -> Dict[str, Any]:
     """Process a single PDF and extract images with embeddings."""
-    pdf = fitz.open(pdf_path)
+    pdf = open_pdf(pdf_path)
     pdf_name = os.path.basename(pdf_path)
     images_processed = 0
     images_excluded = 0
     excluded_images = []
+    exclude_image = build_filter_chain(filters) if filters else None
     
     try:
         for page_num in range(len(pdf)):
             page = pdf[page_num]
             page_text = page.get_text()
             image_list = page.get_images()
+            # Context only depends on the page text, so slice it once per page
+            # rather than reopening the PDF for every image
+            page_context = context_from_page_text(page_text, config) if image_list else ""
             
             for img_idx, img in enumerate(image_list):
                 xref = img[0]
@@ -184,17 +195,7 @@ def process_pdf(
                 }
                 
                 # Extract context
-                context_text = ""
-                if bbox:
-                    bbox_dict = {
-                        "x0": float(bbox.x0),
-                        "y0": float(bbox.y0),
-                        "x1": float(bbox.x1),
-                        "y1": float(bbox.y1),
-                    }
-                    context_text = extract_context_around_image(
-                        pdf_path, page_num + 1, bbox_dict, config
-                    )
+                context_text = page_context if bbox else ""
                 
                 # Build context for filters
                 filter_context = {
@@ -206,12 +207,12 @@ def process_pdf(
                 }
                 
                 # Apply image filters
-                if filters:
-                    should_exclude, exclusion_metadata = should_exclude_image(
-                        image_dict, filter_context, filters
-                    )
+                if exclude_image is not None:
+                    should_exclude, exclusion_metadata = exclude_image(image_dict, filter_context)
                     if should_exclude:
                         images_excluded += 1
+                        if len(excluded_images) >= MAX_EXCLUDED_TRACKED:
+                            continue
                         excluded_images.append({
                             "page": page_num + 1,
                             "index": img_idx,
@@ -237,6 +238,8 @@ def process_pdf(
     
     if excluded_images:
         result["excluded_images"] = excluded_images
+        if images_excluded > len(excluded_images):
+            result["excluded_images_truncated"] = True
     
     return result
 
@@ -271,7 +274,8 @@ def main():
     total_images_processed = 0
     total_images_excluded = 0
     
-    print(f"PROGRESS: pdf 0/{total} Starting...", flush=True)
+    progress = ProgressWriter()
+    progress.write(f"PROGRESS: pdf 0/{total} Starting...")
     
     for pdf_path in pdf_files:
         pdf_name = os.path.basename(pdf_path)
@@ -280,16 +284,18 @@ def main():
             processed += 1
             total_images_processed += result.get("images_processed", 0)
             total_images_excluded += result.get("images_excluded", 0)
-            print(f"PROGRESS: pdf {processed}/{total} {pdf_name}", flush=True)
+            progress.write(f"PROGRESS: pdf {processed}/{total} {pdf_name}")
         except Exception as e:
+            progress.flush()
             print(f"ERROR: Failed to process {pdf_name}: {e}", file=sys.stderr)
             continue
     
-    print(f"PROGRESS: pdf {processed}/{total} Complete", flush=True)
-    print(f"Processed {processed} PDFs", flush=True)
-    print(f"Total images processed: {total_images_processed}", flush=True)
+    progress.write(f"PROGRESS: pdf {processed}/{total} Complete")
+    progress.write(f"Processed {processed} PDFs")
+    progress.write(f"Total images processed: {total_images_processed}")
     if total_images_excluded > 0:
-        print(f"Total images excluded: {total_images_excluded}", flush=True)
+        progress.write(f"Total images excluded: {total_images_excluded}")
+    progress.flush()
 
 
 if __name__ == "__main__":
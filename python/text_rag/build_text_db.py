@@ -10,7 +10,8 @@ Inputs:
 - A directory of PDFs
 
 Outputs:
-- A persisted Chroma DB in output dir
+- A persisted Chroma DB in output dir (or `shard_<k>` DBs listed in
+  `_shards.json` with --shards)
 - A `_manifest.json` capturing build configuration and basic stats
 
 Key knobs:
@@ -21,21 +22,31 @@ Key knobs:
 """
 
 import argparse
-import glob
+import hashlib
 import json
 import os
 import sys
 import time
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import chromadb
 import fitz  # PyMuPDF
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 
+# Allow running as a script without PYTHONPATH=python
+python_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if python_root not in sys.path:
+    sys.path.insert(0, python_root)
+
+from text_rag.progress import ProgressWriter
+from text_rag.shards import shard_dir_name, shard_dirs, write_shard_layout
+from text_rag.text_splitter import SeparatorTextSplitter
+
 # Import module system
 try:
     from rag_bench.modules import get_registry, ModuleType, DocumentProcessor
@@ -45,6 +56,35 @@ except ImportError:
     DocumentProcessor = None
 
 
+# Text extraction flags: plain text, no image blocks (same as get_text()'s
+# default, so one TextPage serves both raw text and layout blocks)
+TEXT_BLOCK_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Pages between MuPDF store trims while parsing a single PDF
+STORE_SHRINK_EVERY_PAGES = 50
+
+# Texts per forward pass when embedding chunks
+EMBED_BATCH_SIZE = 64
+
+# Collection name the query scripts open (langchain_chroma's default)
+COLLECTION_NAME = "langchain"
+
+# SQLite pragmas applied with --unsafe-fast-build
+FAST_BUILD_PRAGMAS = ("journal_mode=OFF", "temp_store=MEMORY", "synchronous=OFF", "locking_mode=EXCLUSIVE")
+
+# HNSW index settings for the Chroma collection. Chroma otherwise builds the
+# index single-threaded with its defaults; these are fixed up front so large
+# builds use every core and insert in predictable batches.
+ADD_BATCH_SIZE = 200
+HNSW_METADATA: Dict[str, Any] = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 100,
+    "hnsw:M": 16,
+    "hnsw:num_threads": os.cpu_count() or 1,
+    "hnsw:batch_size": ADD_BATCH_SIZE,
+}
+
+
 @dataclass
 class BuildConfig:
     input_dir: str
@@ -56,6 +96,11 @@ class BuildConfig:
     embedding_model: str
     embedding_device: str
     include_filename_banner: bool
+    embedding_dtype: str = "auto"
+    splitter: str = "recursive"
+    shards: int = 1
+    unsafe_fast_build: bool = False
+    faiss_index: bool = False
     enabled_modules: List[str] = field(default_factory=list)
     module_configs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
@@ -65,15 +110,13 @@ def _safe_mkdir(path: str) -> None:
 
 
 def _list_pdfs(input_dir: str) -> List[str]:
-    patterns = [
-        os.path.join(input_dir, "*.pdf"),
-        os.path.join(input_dir, "**", "*.pdf"),
-    ]
+    # Single recursive walk; hidden files/dirs are skipped and symlinked dirs
+    # followed, matching the previous glob("**/*.pdf") behaviour
     out: List[str] = []
-    for p in patterns:
-        out.extend(glob.glob(p, recursive=True))
-    # de-dupe while keeping deterministic order
-    out = sorted(set(out))
+    for root, dirs, files in os.walk(input_dir, followlinks=True):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        out.extend(os.path.join(root, f) for f in files if f.endswith(".pdf") and not f.startswith("."))
+    out.sort()
     return out
 
 
@@ -93,40 +136,39 @@ def _detect_header(text: str) -> bool:
     return False
 
 
-def _extract_structured_text(page: fitz.Page) -> Tuple[str, bool]:
+def _extract_structured_text(
+    page: fitz.Page,
+    raw_text: Optional[str] = None,
+    textpage: Optional[fitz.TextPage] = None,
+) -> Tuple[str, bool]:
     """
     A lightweight structured extraction with layout preservation:
     - extract blocks with positions
     - emit headers distinctly
+
+    Falls back to raw text when no structure can be extracted. Pass
+    `raw_text` if the caller already extracted it; otherwise it is extracted
+    at most once, and only when needed. Pass a `textpage` built with
+    TEXT_BLOCK_FLAGS to reuse an existing MuPDF parse.
     """
+    def _raw() -> str:
+        return raw_text if raw_text is not None else _extract_raw_text(page)
+
     try:
-        blocks = page.get_text("dict")
-        sorted_blocks: List[Dict[str, Any]] = []
-        for block in blocks.get("blocks", []):
-            if block.get("type") != 0:
-                continue
-            block_text = ""
-            for line in block.get("lines", []):
-                line_text = ""
-                for span in line.get("spans", []):
-                    line_text += span.get("text", "")
-                if line_text.strip():
-                    block_text += line_text + "\n"
+        # Text-only flags keep MuPDF from collecting image blocks at all
+        text_blocks = [b for b in page.get_text("blocks", flags=TEXT_BLOCK_FLAGS, textpage=textpage) if b[6] == 0]
+
+        # (x0, y0, x1, y1, text, block_no, block_type) tuples carry the only
+        # fields needed here, without the per-span dicts of get_text("dict")
+        sorted_blocks: List[Tuple[float, float, str]] = []
+        for x0, y0, _x1, _y1, block_text, _block_no, _block_type in text_blocks:
             if block_text.strip():
-                bbox = block.get("bbox", [0, 0, 0, 0])
-                sorted_blocks.append(
-                    {
-                        "text": block_text.strip(),
-                        "bbox": bbox,
-                        "position": (bbox[1], bbox[0]),
-                    }
-                )
+                sorted_blocks.append((y0, x0, block_text))
 
-        sorted_blocks.sort(key=lambda x: (x["position"][0], x["position"][1]))
+        sorted_blocks.sort(key=lambda x: (x[0], x[1]))
 
         parts: List[str] = []
-        for b in sorted_blocks:
-            t = b["text"]
+        for _y0, _x0, t in sorted_blocks:
             # split into lines and treat each line as candidate header
             lines = [ln.strip() for ln in t.splitlines() if ln.strip()]
             for ln in lines:
@@ -138,10 +180,32 @@ def _extract_structured_text(page: fitz.Page) -> Tuple[str, bool]:
 
         structured = "\n".join(parts).strip()
         if not structured:
-            return _extract_raw_text(page), False
+            return _raw(), False
         return structured, True
     except Exception:
-        return _extract_raw_text(page), False
+        return _raw(), False
+
+
+def _page_metadata(
+    pdf_path: str,
+    doc_name: str,
+    doc_id: str,
+    page: int,
+    representation: str,
+    preserved: bool,
+) -> Dict[str, Any]:
+    """
+    Page metadata as a flat dict of primitives, so it can go to Chroma as-is.
+    """
+    return {
+        "source": pdf_path,
+        "doc_name": doc_name,
+        "doc_id": doc_id,
+        "page": page,
+        "type": "text_page",
+        "representation": representation,
+        "layout_preserved": bool(preserved),
+    }
 
 
 def _make_documents(pdf_path: str, representation: str, include_filename_banner: bool) -> List[Document]:
@@ -159,11 +223,24 @@ def _make_documents(pdf_path: str, representation: str, include_filename_banner:
     try:
         for page_idx in range(len(pdf)):
             page = pdf[page_idx]
-            if representation == "structured":
-                text, preserved = _extract_structured_text(page)
+            # One MuPDF text parse serves both the emptiness check and the
+            # layout blocks; blank and image-only pages stop here
+            textpage = page.get_textpage(flags=TEXT_BLOCK_FLAGS)
+            raw = page.get_text("text", textpage=textpage) or ""
+            preserved = False
+            if not raw.strip():
+                text = ""
+            elif representation == "structured":
+                text, preserved = _extract_structured_text(page, raw_text=raw, textpage=textpage)
             else:
-                text = _extract_raw_text(page)
-                preserved = False
+                text = raw
+
+            # Drop the page (and its cached text structures) before the next
+            # one is loaded, and periodically trim MuPDF's global store so RSS
+            # stays bounded on very long PDFs
+            page = textpage = None
+            if (page_idx + 1) % STORE_SHRINK_EVERY_PAGES == 0:
+                fitz.TOOLS.store_shrink(100)
 
             text = (text or "").strip()
             if not text:
@@ -175,15 +252,7 @@ def _make_documents(pdf_path: str, representation: str, include_filename_banner:
             docs.append(
                 Document(
                     page_content=text,
-                    metadata={
-                        "source": pdf_path,
-                        "doc_name": base,
-                        "doc_id": pdf_base,
-                        "page": page_idx + 1,
-                        "type": "text_page",
-                        "representation": representation,
-                        "layout_preserved": bool(preserved),
-                    },
+                    metadata=_page_metadata(pdf_path, base, pdf_base, page_idx + 1, representation, preserved),
                 )
             )
     finally:
@@ -191,18 +260,55 @@ def _make_documents(pdf_path: str, representation: str, include_filename_banner:
     return docs
 
 
-def _split_documents(documents: List[Document], chunk_size: int, chunk_overlap: int, separators: List[str]) -> List[Document]:
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
+def _parse_pdfs(
+    pdfs: List[str],
+    representation: str,
+    include_filename_banner: bool,
+    workers: int,
+) -> Iterator[Tuple[int, List[Document]]]:
+    """
+    Extract page Documents from each PDF, yielding (pdf_index, docs).
+    
+    Parsing is CPU-bound and independent per PDF, so with workers > 1 the
+    PDFs are parsed in a process pool and yielded in completion order.
+    """
+    if workers <= 1:
+        for i, pdf_path in enumerate(pdfs):
+            yield i, _make_documents(pdf_path, representation, include_filename_banner)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futures = {
+            ex.submit(_make_documents, pdf_path, representation, include_filename_banner): i
+            for i, pdf_path in enumerate(pdfs)
+        }
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
+
+
+def _make_splitter(cfg: BuildConfig) -> Any:
+    """
+    "recursive" is LangChain's RecursiveCharacterTextSplitter (the default);
+    "fast" is the single-pass SeparatorTextSplitter, which follows the same
+    separator priorities but may place chunk boundaries differently.
+    """
+    if cfg.splitter == "fast":
+        return SeparatorTextSplitter(
+            chunk_size=cfg.chunk_size,
+            chunk_overlap=cfg.chunk_overlap,
+            separators=cfg.separators,
+        )
+    return RecursiveCharacterTextSplitter(
+        chunk_size=cfg.chunk_size,
+        chunk_overlap=cfg.chunk_overlap,
         length_function=len,
         add_start_index=True,
-        separators=separators,
+        separators=cfg.separators,
     )
-    return splitter.split_documents(documents)
 
 
 def _simplify_metadata(doc: Document) -> Document:
+    """Coerce metadata to Chroma-compatible primitives (document processors may add lists/objects)."""
     simple: Dict[str, Any] = {}
     for k, v in (doc.metadata or {}).items():
         if isinstance(v, (str, int, float, bool)):
@@ -214,6 +320,222 @@ def _simplify_metadata(doc: Document) -> Document:
     return Document(page_content=doc.page_content, metadata=simple)
 
 
+def _embedding_model_kwargs(device: str, dtype: str) -> Dict[str, Any]:
+    """
+    Build HuggingFaceEmbeddings model_kwargs for the requested weight dtype.
+    
+    "auto" runs float16 on CUDA, where half-precision matmuls use tensor
+    cores and read half the weight bytes, and float32 elsewhere. bfloat16 on
+    CPU is opt-in since it only pays off on CPUs with native BF16 support.
+    """
+    if dtype == "auto":
+        dtype = "float16" if device.startswith("cuda") else "float32"
+    kwargs: Dict[str, Any] = {"device": device}
+    if dtype != "float32":
+        import torch
+
+        kwargs["model_kwargs"] = {"torch_dtype": getattr(torch, dtype)}
+    return kwargs
+
+
+def _chunk_ids(chunks: List[Document]) -> List[str]:
+    """
+    Deterministic IDs of the form <doc_id>:p<page>:s<start_index>:<hash>.
+    
+    The short blake2b content hash keeps IDs distinct when two PDFs share a
+    file name, and makes re-running a build over the same inputs an
+    idempotent upsert.
+    """
+    ids: List[str] = []
+    seen: Dict[str, int] = {}
+    for c in chunks:
+        meta = c.metadata or {}
+        digest = hashlib.blake2b(c.page_content.encode("utf-8"), digest_size=8).hexdigest()
+        cid = f"{meta.get('doc_id', '')}:p{meta.get('page', 0)}:s{meta.get('start_index', 0)}:{digest}"
+        n = seen.get(cid, 0)
+        seen[cid] = n + 1
+        ids.append(cid if n == 0 else f"{cid}#{n}")
+    return ids
+
+
+def _make_embeddings(cfg: BuildConfig) -> HuggingFaceEmbeddings:
+    return HuggingFaceEmbeddings(
+        model_name=cfg.embedding_model,
+        model_kwargs=_embedding_model_kwargs(cfg.embedding_device, cfg.embedding_dtype),
+        encode_kwargs={"batch_size": EMBED_BATCH_SIZE, "normalize_embeddings": True},
+    )
+
+
+def _apply_fast_build_pragmas(client: Any) -> None:
+    """
+    Relax SQLite durability on a freshly created Chroma DB for bulk loading.
+    
+    The output directory is wiped before every build and a failed build is
+    simply rerun, so journaling and fsyncs buy nothing here. This reaches
+    into Chroma's private SQLite handle; if that layout changes the build
+    carries on with the defaults.
+    """
+    try:
+        from chromadb.db.impl.sqlite import SqliteDB
+
+        conn = client._system.instance(SqliteDB)._conn_pool.connect()
+        for pragma in FAST_BUILD_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
+    except Exception as e:
+        print(f"WARNING: Could not apply fast-build SQLite pragmas: {e}", file=sys.stderr)
+
+
+def _write_collection(
+    output_dir: str,
+    chunks: List[Document],
+    embeddings: HuggingFaceEmbeddings,
+    ids: Optional[List[str]] = None,
+    fast_build: bool = False,
+) -> None:
+    """
+    Embed chunks and insert them into the persisted Chroma collection.
+    
+    Embeddings are computed up front so Chroma does no embedding work, then
+    rows are upserted in ADD_BATCH_SIZE batches to amortize SQLite
+    transactions.
+    """
+    client = chromadb.PersistentClient(path=output_dir)
+    if fast_build:
+        _apply_fast_build_pragmas(client)
+    collection = client.get_or_create_collection(COLLECTION_NAME, metadata=HNSW_METADATA)
+
+    texts = [c.page_content for c in chunks]
+    metadatas = [c.metadata for c in chunks]
+    if ids is None:
+        ids = _chunk_ids(chunks)
+    vectors = embeddings.embed_documents(texts)
+
+    for i in range(0, len(chunks), ADD_BATCH_SIZE):
+        j = i + ADD_BATCH_SIZE
+        collection.upsert(
+            ids=ids[i:j],
+            embeddings=vectors[i:j],
+            documents=texts[i:j],
+            metadatas=metadatas[i:j],
+        )
+
+
+def _build_shard(
+    shard_dir: str, chunks: List[Document], ids: List[str], cfg: BuildConfig, num_threads: int
+) -> int:
+    """
+    Embed and write one shard DB (runs in a worker process).
+    
+    Torch is limited to `num_threads` so that the shard processes together
+    use the machine's cores instead of each starting one thread per core.
+    """
+    try:
+        import torch
+
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+    _safe_mkdir(shard_dir)
+    _write_collection(shard_dir, chunks, _make_embeddings(cfg), ids=ids, fast_build=cfg.unsafe_fast_build)
+    return len(chunks)
+
+
+def _assign_shards(chunks: List[Document], shards: int) -> List[List[int]]:
+    """
+    Chunk row indices per shard, keeping each PDF in one shard.
+    
+    PDFs are placed largest first onto the shard with the fewest chunks so
+    far, so one long PDF does not leave the other shards idle.
+    """
+    rows_by_pdf: Dict[str, List[int]] = {}
+    for row, c in enumerate(chunks):
+        rows_by_pdf.setdefault((c.metadata or {}).get("source", ""), []).append(row)
+    shard_rows: List[List[int]] = [[] for _ in range(shards)]
+    for rows in sorted(rows_by_pdf.values(), key=len, reverse=True):
+        min(shard_rows, key=len).extend(rows)
+    return [sorted(rows) for rows in shard_rows if rows]
+
+
+def _write_sharded_collection(
+    output_dir: str,
+    chunks: List[Document],
+    cfg: BuildConfig,
+    progress: ProgressWriter,
+) -> None:
+    """
+    Write the collection as up to cfg.shards independent Chroma DBs in parallel.
+    
+    Each worker process embeds its shard and writes it to
+    <output_dir>/shard_<k> through its own PersistentClient, so both the
+    embedding and the SQLite/HNSW writes run in parallel. Shards are never
+    merged: _shards.json lists them and query_text.py searches them as one
+    collection.
+    """
+    ids = _chunk_ids(chunks)
+    shard_rows = _assign_shards(chunks, cfg.shards)
+    names = [shard_dir_name(k) for k in range(len(shard_rows))]
+    num_threads = max(1, (os.cpu_count() or 1) // len(shard_rows))
+    with ProcessPoolExecutor(max_workers=len(shard_rows)) as ex:
+        futures = [
+            ex.submit(
+                _build_shard,
+                os.path.join(output_dir, name),
+                [chunks[row] for row in rows],
+                [ids[row] for row in rows],
+                cfg,
+                num_threads,
+            )
+            for name, rows in zip(names, shard_rows)
+        ]
+        for done, fut in enumerate(as_completed(futures), 1):
+            progress.write(f"PROGRESS: shard {done}/{len(futures)} chunks={fut.result()}")
+    progress.flush()
+
+    write_shard_layout(output_dir, names)
+
+
+def _write_faiss_index(output_dir: str) -> int:
+    """
+    Export the built collection (all shards) as a FAISS IndexFlatIP plus a JSONL sidecar.
+    
+    Writes <output_dir>/index.faiss and <output_dir>/faiss_chunks.jsonl,
+    where line i of the sidecar holds the id, text and metadata of index
+    row i. Embeddings are already L2-normalized, so inner product equals
+    cosine similarity. A flat index file can be memory-mapped at load
+    (faiss.IO_FLAG_MMAP) instead of deserializing Chroma's HNSW segment.
+    Returns the number of vectors written.
+    """
+    import faiss
+    import numpy as np
+
+    total = 0
+    index: Optional[Any] = None
+    with open(os.path.join(output_dir, "faiss_chunks.jsonl"), "w", encoding="utf-8") as f:
+        for shard_dir in shard_dirs(output_dir):
+            collection = chromadb.PersistentClient(path=shard_dir).get_collection(COLLECTION_NAME)
+            count = collection.count()
+            total += count
+            for offset in range(0, count, ADD_BATCH_SIZE):
+                batch = collection.get(
+                    include=["embeddings", "documents", "metadatas"],
+                    limit=ADD_BATCH_SIZE,
+                    offset=offset,
+                )
+                vectors = np.asarray(batch["embeddings"], dtype=np.float32)
+                if not len(vectors):
+                    continue
+                faiss.normalize_L2(vectors)
+                if index is None:
+                    index = faiss.IndexFlatIP(vectors.shape[1])
+                index.add(vectors)
+                for cid, text, meta in zip(batch["ids"], batch["documents"], batch["metadatas"]):
+                    f.write(json.dumps({"id": cid, "text": text, "metadata": meta}, ensure_ascii=False) + "\n")
+
+    if index is not None:
+        faiss.write_index(index, os.path.join(output_dir, "index.faiss"))
+    return total
+
+
 def _write_manifest(output_dir: str, cfg: BuildConfig, stats: Dict[str, Any]) -> None:
     manifest = {
         "schema": "rag-lab.textdb.manifest.v1",
@@ -285,17 +607,35 @@ def _apply_document_processors(
         return docs
     
     for processor in processors:
-        # Convert to (content, metadata) tuples for the processor
-        doc_tuples = [(d.page_content, dict(d.metadata or {})) for d in docs]
-        
         try:
-            processed_tuples, context = processor.process_documents(doc_tuples, context)
-            
-            # Convert back to Document objects
-            docs = [
-                Document(page_content=content, metadata=metadata)
-                for content, metadata in processed_tuples
-            ]
+            if type(processor).process_documents is DocumentProcessor.process_documents:
+                # Default per-document processing: reuse the Document objects
+                # rather than rebuilding them from tuples. Results are applied
+                # only once every document succeeded, so a failure leaves the
+                # docs unmodified.
+                results: List[Tuple[Document, str, Dict[str, Any]]] = []
+                new_context = context
+                for d in docs:
+                    content, metadata, step_context = processor.process_document(
+                        d.page_content, dict(d.metadata or {}), new_context
+                    )
+                    if content is None:
+                        continue
+                    new_context = step_context
+                    results.append((d, content, metadata))
+                for d, content, metadata in results:
+                    d.page_content = content
+                    d.metadata = metadata
+                docs = [d for d, _, _ in results]
+                context = new_context
+            else:
+                # Batch processors get the (content, metadata) tuple protocol
+                doc_tuples = [(d.page_content, dict(d.metadata or {})) for d in docs]
+                processed_tuples, context = processor.process_documents(doc_tuples, context)
+                docs = [
+                    Document(page_content=content, metadata=metadata)
+                    for content, metadata in processed_tuples
+                ]
         except Exception as e:
             print(f"WARNING: Document processor '{processor.MODULE_ID}' failed: {e}", file=sys.stderr)
             # Continue with unmodified docs on error
@@ -310,9 +650,46 @@ def main() -> None:
     p.add_argument("--representation", choices=["raw", "structured"], default="structured")
     p.add_argument("--chunk-size", type=int, default=800)
     p.add_argument("--chunk-overlap", type=int, default=200)
+    p.add_argument(
+        "--splitter",
+        choices=["recursive", "fast"],
+        default="recursive",
+        help="Chunking strategy: LangChain's recursive splitter, or a single-pass separator splitter",
+    )
     p.add_argument("--embedding-model", default=os.getenv("TEXT_EMBEDDING_MODEL", "BAAI/bge-large-en-v1.5"))
     p.add_argument("--embedding-device", default=os.getenv("TEXT_EMBEDDING_DEVICE", "cpu"))
+    p.add_argument(
+        "--embedding-dtype",
+        choices=["auto", "float32", "float16", "bfloat16"],
+        default=os.getenv("TEXT_EMBEDDING_DTYPE", "auto"),
+    )
     p.add_argument("--include-filename-banner", action="store_true")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=min(os.cpu_count() or 1, 8),
+        help="Number of processes used to parse PDFs (1 = sequential)",
+    )
+    p.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help=(
+            "Write the DB as this many shard DBs (whole PDFs, balanced by chunk count), each embedded and "
+            "written by its own process with its share of CPU threads; query_text.py searches them together. "
+            "Every process loads its own copy of the model. For CPU builds (shards compete for one GPU)"
+        ),
+    )
+    p.add_argument(
+        "--unsafe-fast-build",
+        action="store_true",
+        help="Disable SQLite journaling/fsync while writing the DB (rerun the build if it fails)",
+    )
+    p.add_argument(
+        "--faiss-index",
+        action="store_true",
+        help="Also export the DB as a FAISS IndexFlatIP (index.faiss + faiss_chunks.jsonl); requires faiss-cpu",
+    )
     p.add_argument(
         "--modules-json",
         default="",
@@ -320,6 +697,13 @@ def main() -> None:
     )
     args = p.parse_args()
 
+    if args.faiss_index:
+        try:
+            import faiss  # noqa: F401
+        except ImportError:
+            print(json.dumps({"error": "--faiss-index requires faiss (pip install faiss-cpu)"}))
+            sys.exit(2)
+
     input_dir = os.path.abspath(args.input_dir)
     output_dir = os.path.abspath(args.output_dir)
 
@@ -352,6 +736,11 @@ def main() -> None:
         embedding_model=args.embedding_model,
         embedding_device=args.embedding_device,
         include_filename_banner=bool(args.include_filename_banner),
+        embedding_dtype=args.embedding_dtype,
+        splitter=args.splitter,
+        shards=max(1, min(args.shards, len(pdfs))),
+        unsafe_fast_build=bool(args.unsafe_fast_build),
+        faiss_index=bool(args.faiss_index),
         enabled_modules=enabled_modules,
         module_configs=module_configs,
     )
@@ -360,27 +749,50 @@ def main() -> None:
     doc_processors = _load_document_processors(enabled_modules, module_configs)
 
     start = time.time()
-    all_docs: List[Document] = []
-
-    for i, pdf_path in enumerate(pdfs, 1):
-        docs = _make_documents(pdf_path, cfg.representation, cfg.include_filename_banner)
-        all_docs.extend(docs)
-        print(f"PROGRESS: pdf {i}/{len(pdfs)} pages_docs={len(docs)} file={os.path.basename(pdf_path)}", flush=True)
-
-    # Apply document processor modules
-    if doc_processors:
-        print(f"PROGRESS: applying {len(doc_processors)} document processor(s)...", flush=True)
+    progress = ProgressWriter()
+    workers = max(1, min(args.workers, len(pdfs)))
+
+    # Document processors may look across the whole corpus, so page docs are
+    # only buffered when some are enabled; otherwise each PDF is split as soon
+    # as it is parsed and its page docs are dropped.
+    splitter = _make_splitter(cfg)
+    stream_split = not doc_processors
+
+    # Collect per-PDF results by index so page/chunk order stays deterministic
+    # regardless of which worker finishes first
+    results_by_pdf: List[List[Document]] = [[] for _ in pdfs]
+    page_doc_count = 0
+    parsed = 0
+    for idx, docs in _parse_pdfs(pdfs, cfg.representation, cfg.include_filename_banner, workers):
+        page_doc_count += len(docs)
+        if stream_split:
+            # Page metadata is already primitive (the splitter only adds an
+            # int start_index), so no simplification pass is needed
+            results_by_pdf[idx] = splitter.split_documents(docs)
+        else:
+            results_by_pdf[idx] = docs
+        parsed += 1
+        progress.write(f"PROGRESS: pdf {parsed}/{len(pdfs)} pages_docs={len(docs)} file={os.path.basename(pdfs[idx])}")
+
+    if stream_split:
+        chunks: List[Document] = [c for pdf_chunks in results_by_pdf for c in pdf_chunks]
+        results_by_pdf.clear()
+        progress.flush()
+    else:
+        all_docs: List[Document] = [d for docs in results_by_pdf for d in docs]
+        results_by_pdf.clear()
+
+        # Apply document processor modules
+        progress.write(f"PROGRESS: applying {len(doc_processors)} document processor(s)...")
+        progress.flush()
         context = {"config": asdict(cfg)}
         all_docs = _apply_document_processors(all_docs, doc_processors, context)
-        print(f"PROGRESS: {len(all_docs)} documents after processing", flush=True)
-
-    chunks = _split_documents(all_docs, cfg.chunk_size, cfg.chunk_overlap, cfg.separators)
-    chunks = [_simplify_metadata(d) for d in chunks]
+        page_doc_count = len(all_docs)
+        progress.write(f"PROGRESS: {len(all_docs)} documents after processing")
+        progress.flush()
 
-    embeddings = HuggingFaceEmbeddings(
-        model_name=cfg.embedding_model,
-        model_kwargs={"device": cfg.embedding_device},
-    )
+        chunks = [_simplify_metadata(d) for d in splitter.split_documents(all_docs)]
+        del all_docs
 
     # Build DB (overwrite output_dir contents)
     # Chroma persists multiple files; if output_dir is reused, delete it first for clean experiments.
@@ -398,12 +810,20 @@ def main() -> None:
         except Exception:
             pass
 
-    Chroma.from_documents(chunks, embeddings, persist_directory=output_dir)
+    if cfg.shards > 1:
+        _write_sharded_collection(output_dir, chunks, cfg, progress)
+    else:
+        _write_collection(output_dir, chunks, _make_embeddings(cfg), fast_build=cfg.unsafe_fast_build)
+
+    if cfg.faiss_index:
+        progress.write("PROGRESS: writing FAISS index...")
+        progress.flush()
+        _write_faiss_index(output_dir)
 
     elapsed = time.time() - start
     stats = {
         "pdfCount": len(pdfs),
-        "pageDocs": len(all_docs),
+        "pageDocs": page_doc_count,
         "chunks": len(chunks),
         "seconds": elapsed,
     }
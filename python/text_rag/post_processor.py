@@ -6,11 +6,14 @@ term overlap. For domain-specific relevance scoring, create a custom
 RelevanceFilter module.
 """
 
+import heapq
 import re
 from typing import List, Tuple
 
 import numpy as np
 
+_WORD_RE = re.compile(r"\b\w+\b")
+
 
 class SimplePostProcessor:
     """
@@ -30,20 +33,17 @@ class SimplePostProcessor:
         Uses term overlap between query and document, with a length penalty
         for very short or very long documents.
         """
-        query_lower = query.lower()
-        doc_lower = document.lower()
-
-        query_words = set(re.findall(r"\b\w+\b", query_lower))
-        doc_words = set(re.findall(r"\b\w+\b", doc_lower))
+        query_words = set(_WORD_RE.findall(query.lower()))
 
         if not query_words:
             return 0.0
 
-        overlap = len(query_words.intersection(doc_words))
+        doc_tokens = _WORD_RE.findall(document.lower())
+        overlap = len(query_words.intersection(doc_tokens))
         keyword_score = overlap / len(query_words)
 
         # Length penalty: prefer medium-length documents
-        doc_length = len(document.split())
+        doc_length = len(doc_tokens)
         length_penalty = 1.0
         if doc_length < 50:
             length_penalty = 0.7
@@ -53,6 +53,39 @@ class SimplePostProcessor:
         relevance_score = keyword_score * length_penalty
         return float(min(relevance_score, 1.0))
 
+    def score_documents(self, query: str, documents: List[str]) -> np.ndarray:
+        """
+        Score many documents at once; equivalent to calculate_relevance_score
+        per document.
+
+        Documents are reduced to a doc x query-term indicator matrix, so the
+        overlap, keyword score and length penalty are whole-array operations.
+        """
+        vocab = {t: i for i, t in enumerate(frozenset(_WORD_RE.findall(query.lower())))}
+        n_docs = len(documents)
+        if not vocab or not n_docs:
+            return np.zeros(n_docs, dtype=np.float64)
+
+        rows: List[int] = []
+        cols: List[int] = []
+        lengths = np.empty(n_docs, dtype=np.int64)
+        for i, doc in enumerate(documents):
+            doc_tokens = _WORD_RE.findall(doc.lower())
+            lengths[i] = len(doc_tokens)
+            for term in vocab.keys() & doc_tokens:
+                rows.append(i)
+                cols.append(vocab[term])
+
+        indicators = np.zeros((n_docs, len(vocab)), dtype=np.float64)
+        indicators[rows, cols] = 1.0
+        overlap = indicators @ np.ones(len(vocab), dtype=np.float64)
+        keyword_score = overlap / len(vocab)
+
+        # Length penalty: prefer medium-length documents
+        length_penalty = np.where(lengths < 50, 0.7, np.where(lengths > 1000, 0.8, 1.0))
+
+        return np.minimum(keyword_score * length_penalty, 1.0)
+
     def filter_documents(self, query: str, documents: List[str], target_count: int = 10) -> Tuple[List[str], float]:
         """
         Filter documents based on relevance score.
@@ -62,17 +95,15 @@ class SimplePostProcessor:
         if not documents:
             return [], 0.0
 
-        scored_docs = []
-        for doc in documents:
-            score = self.calculate_relevance_score(query, doc)
-            if score >= self.min_relevance_score:
-                scored_docs.append((doc, score))
+        scores = self.score_documents(query, documents)
+        passing = np.flatnonzero(scores >= self.min_relevance_score)
+        if not len(passing):
+            return [], 0.0
 
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
-        filtered_docs = [doc for doc, _ in scored_docs[:target_count]]
+        # Partial selection of the top target_count; like a stable sort,
+        # nlargest keeps the input order among equal scores
+        top = heapq.nlargest(target_count, passing.tolist(), key=scores.__getitem__)
+        filtered_docs = [documents[i] for i in top]
 
-        avg_score = float(np.mean([s for _, s in scored_docs])) if scored_docs else 0.0
+        avg_score = float(scores[passing].mean())
         return filtered_docs, avg_score
-
-
-
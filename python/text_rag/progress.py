@@ -0,0 +1,72 @@
+"""
+Buffered writer for `PROGRESS:` lines.
+
+The build scripts report progress to the API server by printing
+`PROGRESS: pdf i/n ...` lines on stdout. Flushing after every line is
+wasteful on large corpora, so lines are buffered and flushed every
+`flush_every` lines or on completion. No line waits longer than
+`max_interval` seconds: a line after a quiet period is flushed at once,
+and a background timer flushes lines that arrive between flushes.
+"""
+
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+
+class ProgressWriter:
+    """
+    Line writer that batches flushes to the underlying stream.
+
+    Usage:
+        ```python
+        progress = ProgressWriter()
+        for i, path in enumerate(paths, 1):
+            progress.write(f"PROGRESS: pdf {i}/{len(paths)} file={path}")
+        progress.flush()
+        ```
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        flush_every: int = 10,
+        max_interval: float = 1.0,
+    ):
+        self.stream = stream or sys.stdout
+        self.flush_every = max(1, flush_every)
+        self.max_interval = max_interval
+        self._pending = 0
+        # Nothing flushed yet, so the first line goes out immediately
+        self._last_flush = float("-inf")
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def write(self, line: str) -> None:
+        """Write a single line, flushing if the batch is full or stale."""
+        with self._lock:
+            self.stream.write(line + "\n")
+            self._pending += 1
+            elapsed = time.monotonic() - self._last_flush
+            if self._pending >= self.flush_every or elapsed >= self.max_interval:
+                self._flush_locked()
+            elif self._timer is None:
+                # Bound how long this line can sit in the buffer if no
+                # further writes arrive
+                self._timer = threading.Timer(self.max_interval - elapsed, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Flush any buffered lines."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.stream.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
@@ -13,22 +13,30 @@ Output: JSON on stdout.
 """
 
 import argparse
+import functools
+import hashlib
+import heapq
 import json
+import math
 import os
+import pickle
 import sys
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 
 from text_rag.post_processor import SimplePostProcessor
+from text_rag.shards import shard_dirs
 
-try:
-    from rank_bm25 import BM25Okapi  # type: ignore
-except Exception:
-    BM25Okapi = None
 
+_WORD_RE = re.compile(r"\b\w+\b")
 
 DEFAULT_EXCLUDED_TYPES = {
     "image_context",
@@ -52,13 +60,65 @@ def _get_embedding_model() -> Tuple[str, str]:
     return model_name, device
 
 
-def _load_db(chroma_path: str) -> Chroma:
-    model_name, device = _get_embedding_model()
-    embeddings = HuggingFaceEmbeddings(
+@functools.lru_cache(maxsize=2)
+def _load_embeddings(model_name: str, device: str) -> HuggingFaceEmbeddings:
+    """One embedding model per (model, device), shared by every DB handle in the process."""
+    return HuggingFaceEmbeddings(
         model_name=model_name,
         model_kwargs={"device": device},
     )
-    return Chroma(persist_directory=chroma_path, embedding_function=embeddings)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_db_cached(chroma_path: str, model_name: str, device: str) -> Chroma:
+    return Chroma(persist_directory=chroma_path, embedding_function=_load_embeddings(model_name, device))
+
+
+class _ShardedChroma:
+    """
+    Read-only view over the shard DBs of a `build_text_db.py --shards` build.
+
+    Implements the part of the Chroma API that run_query uses. A vector
+    search takes the top k of every shard and keeps the k nearest overall;
+    get() asks each shard and concatenates the answers.
+    """
+
+    def __init__(self, shards: List[Chroma]):
+        self.shards = shards
+        self.embeddings = shards[0].embeddings
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Any]:
+        hits: List[Tuple[Any, float]] = []
+        for shard in self.shards:
+            hits.extend(shard.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter))
+        # Scores are distances: smaller is nearer
+        hits.sort(key=lambda hit: hit[1])
+        return [doc for doc, _ in hits[:k]]
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, List[Any]]:
+        merged: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": []}
+        for shard in self.shards:
+            got = shard.get(ids=ids, where=where, include=include or ["documents", "metadatas"])
+            for key, values in merged.items():
+                values.extend(got.get(key) or [])
+        return merged
+
+
+def _shards_of(db: Any) -> List[Chroma]:
+    return getattr(db, "shards", None) or [db]
+
+
+def _load_db(chroma_path: str) -> Chroma:
+    model_name, device = _get_embedding_model()
+    shards = [_load_db_cached(d, model_name, device) for d in shard_dirs(os.path.abspath(chroma_path))]
+    return shards[0] if len(shards) == 1 else _ShardedChroma(shards)
 
 
 def _enhance_query(query: str, enable: bool) -> Tuple[str, List[str]]:
@@ -88,6 +148,369 @@ def _exclude_image_docs(results: List[Any], exclude_types: bool) -> List[Any]:
     return filtered
 
 
+def _with_type_exclusion(where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add a `type $nin DEFAULT_EXCLUDED_TYPES` clause to a Chroma where filter."""
+    clause = {"type": {"$nin": sorted(DEFAULT_EXCLUDED_TYPES)}}
+    return {"$and": [where, clause]} if where else clause
+
+
+def _vector_search(
+    db: Chroma,
+    embedding: List[float],
+    k: int,
+    where: Optional[Dict[str, Any]],
+    exclude_types: bool,
+) -> List[Any]:
+    """
+    Vector search with image-derived docs excluded inside Chroma when requested.
+
+    Chroma's $nin only matches records that have a `type` key. If the
+    pushed-down filter yields fewer than k hits (small DB, or untyped
+    records), search again without it and post-filter, as before.
+    """
+    if exclude_types:
+        results = db.similarity_search_by_vector(embedding, k=k, filter=_with_type_exclusion(where))
+        if len(results) >= k:
+            return results
+    results = db.similarity_search_by_vector(embedding, k=k, filter=where)
+    return _exclude_image_docs(results, exclude_types)
+
+
+def _tokenize(s: str) -> List[str]:
+    # Interned, so the corpus holds one string object per distinct term
+    return [sys.intern(t) for t in _WORD_RE.findall((s or "").lower())]
+
+
+def _content_key(text: str) -> bytes:
+    """Stable short digest of a document's text (for matching vector hits to corpus rows)."""
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=8).digest()
+
+
+# Bumped whenever the pickled _LexicalCorpus layout changes
+LEXICAL_CACHE_VERSION = 2
+
+# rank_bm25 BM25Okapi defaults
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+
+class _LexicalCorpus:
+    """
+    Chroma corpus prepared for lexical retrieval, cached across queries.
+
+    Holds record IDs, the integer-encoded tokens and a content-digest index,
+    but not the document texts: those are fetched by ID for the top-ranked
+    hits only. Tokens are encoded as documents stream in, so neither the
+    texts nor per-document token lists are ever held for the whole corpus.
+    The BM25 postings are built lazily.
+    """
+
+    def __init__(self, records: Iterable[Tuple[str, str]], stamp: Tuple[float, int]):
+        self.ids: List[str] = []
+        self.stamp = stamp
+        # First occurrence wins, as with list.index
+        self.content_index: Dict[bytes, int] = {}
+        vocab: Dict[str, int] = {}
+        flat = array("i")
+        lengths: List[int] = []
+        for rid, doc in records:
+            self.content_index.setdefault(_content_key(doc), len(self.ids))
+            self.ids.append(rid)
+            toks = _tokenize(doc)
+            flat.extend(vocab.setdefault(t, len(vocab)) for t in toks)
+            lengths.append(len(toks))
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # CSR form: doc i's token IDs are flat[offsets[i]:offsets[i + 1]]
+        self.token_ids: Tuple[Dict[str, int], np.ndarray, np.ndarray] = (
+            vocab,
+            np.frombuffer(flat, dtype=np.int32).copy() if flat else np.zeros(0, dtype=np.int32),
+            offsets,
+        )
+        self.bm25_index: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+        self.cache_key: Optional[Tuple[str, str]] = None
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def state(self) -> Dict[str, Any]:
+        """Plain-container snapshot for pickling (loads whether this file runs as a script or a module)."""
+        state = {k: v for k, v in vars(self).items() if k not in {"cache_key", "dirty"}}
+        state["version"] = LEXICAL_CACHE_VERSION
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "_LexicalCorpus":
+        corpus = cls((), tuple(state["stamp"]))
+        corpus.__dict__.update((k, v) for k, v in state.items() if k in corpus.__dict__)
+        corpus.cache_key = None
+        corpus.dirty = False
+        return corpus
+
+    def get_token_ids(self) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+        """Integer-encoded corpus in CSR form: (vocab, flat, offsets)."""
+        return self.token_ids
+
+    def get_bm25_index(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Term-major postings for BM25 over the token-ID vocabulary:
+        (term_offsets, post_docs, post_weights, idf), where term t occurs in
+        documents post_docs[term_offsets[t]:term_offsets[t + 1]] with
+        precomputed BM25 term weights post_weights (everything but the IDF).
+        Weights and IDFs follow rank_bm25's BM25Okapi exactly.
+        """
+        if self.bm25_index is None:
+            vocab, flat, offsets = self.get_token_ids()
+            n_docs = len(self.ids)
+            doc_len = np.diff(offsets)
+            avgdl = float(doc_len.sum()) / n_docs if n_docs else 0.0
+
+            # (term, doc) pairs, sorted by term then doc, with their counts
+            stride = max(n_docs, 1)
+            doc_of_token = np.repeat(np.arange(n_docs, dtype=np.int64), doc_len)
+            keys, tf = np.unique(flat.astype(np.int64) * stride + doc_of_token, return_counts=True)
+            post_terms = keys // stride
+            post_docs = (keys % stride).astype(np.int32)
+            df = np.bincount(post_terms, minlength=len(vocab))
+            term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+            np.cumsum(df, out=term_offsets[1:])
+
+            tf = tf.astype(np.float64)
+            post_weights = tf * (BM25_K1 + 1) / (
+                tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len[post_docs] / avgdl)
+            )
+
+            # math.log per term (in first-occurrence order, as rank_bm25 sums them)
+            idf = np.array(
+                [math.log(n_docs - n + 0.5) - math.log(n + 0.5) for n in df.tolist()],
+                dtype=np.float64,
+            )
+            if len(idf):
+                eps = BM25_EPSILON * (sum(idf.tolist()) / len(idf))
+                idf[idf < 0] = eps
+
+            self.bm25_index = (term_offsets, post_docs, post_weights, idf)
+            self.dirty = True
+        return self.bm25_index
+
+
+# Records per db.get page when building the lexical corpus
+CORPUS_FETCH_BATCH = 2048
+
+# Lexical corpora kept in memory (LRU) and pickled cache files kept on disk
+LEXICAL_CACHE_MAX_ENTRIES = 4
+LEXICAL_CACHE_MAX_FILES = 16
+
+_LEXICAL_CACHE: "OrderedDict[Tuple[str, str], _LexicalCorpus]" = OrderedDict()
+_LEXICAL_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key: Tuple[str, str]) -> Optional[_LexicalCorpus]:
+    with _LEXICAL_CACHE_LOCK:
+        corpus = _LEXICAL_CACHE.get(key)
+        if corpus is not None:
+            _LEXICAL_CACHE.move_to_end(key)
+        return corpus
+
+
+def _cache_put(key: Tuple[str, str], corpus: _LexicalCorpus) -> None:
+    with _LEXICAL_CACHE_LOCK:
+        _LEXICAL_CACHE[key] = corpus
+        _LEXICAL_CACHE.move_to_end(key)
+        while len(_LEXICAL_CACHE) > LEXICAL_CACHE_MAX_ENTRIES:
+            _LEXICAL_CACHE.popitem(last=False)
+
+
+def _db_stamp(chroma_path: str) -> Tuple[float, int]:
+    """
+    (mtime, size) of the Chroma SQLite file; changes whenever the DB is rebuilt or written.
+
+    For a sharded DB: the newest mtime and the total size over all shards.
+    """
+    mtime, size = 0.0, 0
+    for shard_dir in shard_dirs(chroma_path):
+        try:
+            st = os.stat(os.path.join(shard_dir, "chroma.sqlite3"))
+        except OSError:
+            st = os.stat(shard_dir)
+        mtime, size = max(mtime, st.st_mtime), size + st.st_size
+    return mtime, size
+
+
+def _lexical_cache_dir() -> str:
+    return os.getenv("TEXT_BM25_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "rag-lab"))
+
+
+def _lexical_cache_file(key: Tuple[str, str]) -> str:
+    digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_lexical_cache_dir(), f"bm25_{digest}.pkl")
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _prune_lexical_cache_files() -> None:
+    """Delete all but the LEXICAL_CACHE_MAX_FILES most recently used cache files."""
+    cache_dir = _lexical_cache_dir()
+    try:
+        names = [n for n in os.listdir(cache_dir) if n.startswith("bm25_") and n.endswith(".pkl")]
+    except OSError:
+        return
+    if len(names) <= LEXICAL_CACHE_MAX_FILES:
+        return
+    aged: List[Tuple[float, str]] = []
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            aged.append((os.stat(path).st_mtime, path))
+        except OSError:
+            pass
+    aged.sort(reverse=True)
+    for _mtime, path in aged[LEXICAL_CACHE_MAX_FILES:]:
+        _remove_quietly(path)
+
+
+def _save_lexical_corpus(corpus: _LexicalCorpus) -> None:
+    """Write a new or updated cache entry to disk (no-op if caching is off or nothing changed)."""
+    if corpus.cache_key is None or not corpus.dirty:
+        return
+    path = _lexical_cache_file(corpus.cache_key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(corpus.state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        corpus.dirty = False
+    except Exception as e:
+        print(f"WARNING: Could not write BM25 cache {path}: {e}", file=sys.stderr)
+        return
+    _prune_lexical_cache_files()
+
+
+def _iter_corpus(
+    db: Chroma, where: Optional[Dict[str, Any]], batch: int = CORPUS_FETCH_BATCH
+) -> Iterator[Tuple[str, str]]:
+    """(id, text) for every record matching `where`, fetched `batch` records at a time, shard by shard."""
+    for shard in _shards_of(db):
+        offset = 0
+        while True:
+            got = shard.get(where=where, include=["documents"], limit=batch, offset=offset)
+            ids = got.get("ids", []) or []
+            if not ids:
+                break
+            docs = got.get("documents", []) or []
+            yield from zip(ids, (d or "" for d in docs))
+            offset += len(ids)
+
+
+def _load_lexical_corpus(db: Chroma, chroma_path: str, where: Optional[Dict[str, Any]]) -> _LexicalCorpus:
+    """
+    Fetch and tokenize the lexical-retrieval corpus, reusing cached copies.
+
+    Entries are keyed by (DB path, where filter) and are valid while the
+    Chroma SQLite file is unchanged. The LEXICAL_CACHE_MAX_ENTRIES most
+    recently used are kept in memory, and up to LEXICAL_CACHE_MAX_FILES are
+    pickled under ~/.cache/rag-lab so that separate
+    query_text.py runs (one per API query) skip the paged corpus fetch,
+    tokenization and BM25 index build. Set TEXT_BM25_CACHE=0 to disable.
+    """
+    use_cache = _bool_env("TEXT_BM25_CACHE", True)
+    key = (os.path.abspath(chroma_path), json.dumps(where or {}, sort_keys=True))
+    stamp = _db_stamp(chroma_path)
+
+    if use_cache:
+        cached = _cache_get(key)
+        if cached is not None and cached.stamp == stamp:
+            return cached
+        path = _lexical_cache_file(key)
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            state = None
+        except Exception:
+            # Unreadable: drop it, a fresh copy is written after this query
+            _remove_quietly(path)
+            state = None
+        if state is not None and state.get("version") == LEXICAL_CACHE_VERSION and tuple(state["stamp"]) == stamp:
+            cached = _LexicalCorpus.from_state(state)
+            cached.cache_key = key
+            _cache_put(key, cached)
+            try:
+                # Recently used, for pruning by mtime
+                os.utime(path)
+            except OSError:
+                pass
+            return cached
+        # A stale file is overwritten when the rebuilt corpus is saved
+
+    corpus = _LexicalCorpus(_iter_corpus(db, where), stamp)
+    if use_cache:
+        corpus.cache_key = key
+        corpus.dirty = True
+        _cache_put(key, corpus)
+    return corpus
+
+
+def _tf_scores(corpus: _LexicalCorpus, q_tokens: List[str]) -> List[float]:
+    """
+    Raw term-frequency score per document: how many of its tokens are query terms.
+
+    Query terms are marked in a mask over the integer-encoded corpus; NumPy
+    gathers the mask over all tokens and takes per-document sums as
+    differences of a running total (which, unlike np.add.reduceat, also
+    handles empty documents).
+    """
+    vocab, flat, offsets = corpus.get_token_ids()
+    q_ids = [vocab[t] for t in set(q_tokens) if t in vocab]
+    if not q_ids:
+        return [0.0] * len(corpus)
+    q_mask = np.zeros(len(vocab), dtype=np.int32)
+    q_mask[q_ids] = 1
+    running = np.zeros(len(flat) + 1, dtype=np.int64)
+    np.cumsum(q_mask[flat], out=running[1:])
+    return (running[offsets[1:]] - running[offsets[:-1]]).astype(np.float64).tolist()
+
+
+def _bm25_scores(corpus: _LexicalCorpus, q_tokens: List[str]) -> List[float]:
+    """
+    BM25 (Okapi) score for every corpus document, same as rank_bm25's
+    BM25Okapi.get_scores. Each query term is one vectorized update over its
+    postings, instead of a Python loop over every document.
+    """
+    vocab = corpus.get_token_ids()[0]
+    term_offsets, post_docs, post_weights, idf = corpus.get_bm25_index()
+    scores = np.zeros(len(corpus), dtype=np.float64)
+    for t in q_tokens:
+        tid = vocab.get(t)
+        if tid is None:
+            continue
+        lo, hi = term_offsets[tid], term_offsets[tid + 1]
+        # A term's postings list each document once, so this is a plain scatter-add
+        scores[post_docs[lo:hi]] += idf[tid] * post_weights[lo:hi]
+    return scores.tolist()
+
+
+def _fetch_by_ids(db: Chroma, ids: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Text and metadata for the given record IDs, keyed by ID."""
+    if not ids:
+        return {}
+    got = db.get(ids=ids, include=["documents", "metadatas"])
+    docs = got.get("documents", []) or []
+    metas = got.get("metadatas", []) or []
+    return {
+        rid: (docs[j], (metas[j] if j < len(metas) else None) or {})
+        for j, rid in enumerate(got.get("ids", []) or [])
+    }
+
+
 def _apply_post_filter(
     query: str,
     docs: List[Any],
@@ -113,12 +536,11 @@ def _apply_post_filter(
         }
 
     # Re-map filtered text back to Document objects, preserving order
-    out_docs: List[Any] = []
-    for content in filtered_parts:
-        for d in docs:
-            if d.page_content == content:
-                out_docs.append(d)
-                break
+    # (the first doc with a given text wins, as with a linear scan)
+    by_content: Dict[str, Any] = {}
+    for d in docs:
+        by_content.setdefault(d.page_content, d)
+    out_docs: List[Any] = [by_content[c] for c in filtered_parts if c in by_content]
 
     return out_docs[:k], {
         "post_processing_applied": True,
@@ -149,68 +571,54 @@ def run_query(
     enhanced_query, matched_pieces = _enhance_query(query, enable_game_piece_enhancement)
 
     initial_k = k * 2 if enable_filtering else k
+
+    # Embed the query at most once per run, whichever vector searches run
+    _query_embedding: List[List[float]] = []
+
+    def query_embedding() -> List[float]:
+        if not _query_embedding:
+            _query_embedding.append(db.embeddings.embed_query(enhanced_query))
+        return _query_embedding[0]
+
     try:
         if retrieval_method == "vector":
-            results = db.similarity_search(enhanced_query, k=initial_k, filter=where)
+            results = _vector_search(db, query_embedding(), initial_k, where, exclude_image_types)
         else:
             results = []
     except Exception as e:
         return {"error": f"Search failed: {e}"}
 
-    # Lexical retrieval (BM25/TF) uses Chroma.get to fetch candidate corpus, then ranks in Python.
+    # Lexical retrieval (BM25/TF) ranks a cached token index of the corpus in
+    # Python, then fetches only the top-ranked documents from Chroma.
     if retrieval_method in {"bm25", "tf", "hybrid"}:
         try:
-            got = db.get(where=where, include=["documents", "metadatas"])
-            corpus_docs = got.get("documents", []) or []
-            corpus_metas = got.get("metadatas", []) or []
+            corpus = _load_lexical_corpus(db, chroma_path, where)
         except Exception as e:
             return {"error": f"Corpus fetch failed for lexical retrieval: {e}"}
+        q_tokens = _tokenize(enhanced_query)
 
-        def tokenize(s: str) -> List[str]:
-            return re.findall(r"\b\w+\b", (s or "").lower())
-
-        tokenized_corpus = [tokenize(d) for d in corpus_docs]
-        q_tokens = tokenize(enhanced_query)
-
-        scores: List[float] = []
-        if retrieval_method == "tf" or bm25_variant == "tf":
-            q_set = set(q_tokens)
-            for toks in tokenized_corpus:
-                freq = 0
-                for t in toks:
-                    if t in q_set:
-                        freq += 1
-                scores.append(float(freq))
+        if retrieval_method == "tf" or bm25_variant != "bm25":
+            # "bm25_no_idf" treats terms equally; raw term frequency is used
+            # as a close proxy
+            scores = _tf_scores(corpus, q_tokens)
         else:
-            if BM25Okapi is None:
-                return {"error": "rank_bm25 not installed; install python/requirements-text.txt"}
-            bm25 = BM25Okapi(tokenized_corpus)
-            scores = [float(s) for s in bm25.get_scores(q_tokens)]
-            if bm25_variant == "bm25_no_idf":
-                # Approximate “no idf” by multiplying by a constant idf (i.e., treat terms equally)
-                # Implemented as raw term frequency as a close proxy.
-                q_set = set(q_tokens)
-                scores = []
-                for toks in tokenized_corpus:
-                    freq = 0
-                    for t in toks:
-                        if t in q_set:
-                            freq += 1
-                    scores.append(float(freq))
+            scores = _bm25_scores(corpus, q_tokens)
+
+        _save_lexical_corpus(corpus)
 
         # Vector scores for hybrid: use initial vector retrieval ranks as weak signal
         vector_rank_score: Dict[int, float] = {}
         if retrieval_method == "hybrid":
             try:
-                vres = db.similarity_search(enhanced_query, k=min(max(initial_k, 25), 200), filter=where)
-                vres = _exclude_image_docs(vres, exclude_image_types)
+                vres = _vector_search(
+                    db, query_embedding(), min(max(initial_k, 25), 200), where, exclude_image_types
+                )
+                # Use content match to locate index in corpus (best-effort;
+                # first occurrence wins, like list.index)
                 for r_idx, d in enumerate(vres):
-                    # Use content match to locate index in corpus (best-effort)
-                    try:
-                        i = corpus_docs.index(d.page_content)
+                    i = corpus.content_index.get(_content_key(d.page_content))
+                    if i is not None:
                         vector_rank_score[i] = 1.0 / float(r_idx + 1)
-                    except ValueError:
-                        continue
             except Exception:
                 pass
 
@@ -226,18 +634,29 @@ def run_query(
                 hybrid_scores.append(0.7 * b + 0.3 * v)
             scores = hybrid_scores
 
-        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        # Only the top initial_k are used, so select them instead of sorting
+        # every score (nlargest keeps index order among ties, like sorted)
+        ranked = heapq.nlargest(initial_k, range(len(scores)), key=scores.__getitem__)
         # Build “results” as lightweight objects matching langchain Documents shape
         class _DocObj:
             def __init__(self, content: str, meta: Dict[str, Any]):
                 self.page_content = content
                 self.metadata = meta
 
+        # Only the survivors' text and metadata are read back from Chroma
+        try:
+            fetched = _fetch_by_ids(db, [corpus.ids[idx] for idx in ranked])
+        except Exception as e:
+            return {"error": f"Document fetch failed for lexical retrieval: {e}"}
         results = []
-        for idx in ranked[:initial_k]:
-            results.append(_DocObj(corpus_docs[idx], corpus_metas[idx] if idx < len(corpus_metas) else {}))
-
-    results = _exclude_image_docs(results, exclude_image_types)
+        for idx in ranked:
+            hit = fetched.get(corpus.ids[idx])
+            if hit is not None:
+                results.append(_DocObj(*hit))
+
+        # The lexical corpus comes from db.get(where=...) unfiltered by type;
+        # vector results were already filtered in _vector_search
+        results = _exclude_image_docs(results, exclude_image_types)
 
     final_docs, post_meta = _apply_post_filter(
         query=query,
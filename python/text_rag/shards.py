@@ -0,0 +1,32 @@
+"""
+On-disk layout of sharded text DBs.
+
+`build_text_db.py --shards K` writes K independent Chroma DBs under
+`<output_dir>/shard_<k>` and lists them in `<output_dir>/_shards.json`.
+An unsharded build has no layout file and is its own single shard.
+"""
+
+import json
+import os
+from typing import List
+
+SHARDS_FILE = "_shards.json"
+
+
+def shard_dir_name(index: int) -> str:
+    return f"shard_{index}"
+
+
+def write_shard_layout(output_dir: str, names: List[str]) -> None:
+    with open(os.path.join(output_dir, SHARDS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"shards": names}, f, indent=2)
+
+
+def shard_dirs(chroma_path: str) -> List[str]:
+    """Chroma persist directories making up the DB at `chroma_path`."""
+    try:
+        with open(os.path.join(chroma_path, SHARDS_FILE), "r", encoding="utf-8") as f:
+            names = json.load(f).get("shards") or []
+    except (OSError, ValueError):
+        return [chroma_path]
+    return [os.path.join(chroma_path, name) for name in names] or [chroma_path]
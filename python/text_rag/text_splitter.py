@@ -0,0 +1,94 @@
+"""
+Single-pass separator-aware text splitter.
+
+`RecursiveCharacterTextSplitter` splits on the highest-priority separator,
+then re-splits and re-merges every oversized piece with the next one down.
+On long pages that means many passes over the same text. This splitter
+walks each text once: every chunk ends at the last occurrence of the
+highest-priority separator that fits within `chunk_size`, falling back to a
+hard cut only when no separator fits.
+
+Chunks follow the same conventions as the LangChain splitter it replaces
+(separators start the next chunk, whitespace is stripped, `start_index` is
+recorded), but boundaries are not guaranteed to be identical.
+"""
+
+from typing import List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+
+class SeparatorTextSplitter:
+    """
+    Greedy chunk packer over a priority-ordered list of separators.
+
+    Usage:
+        ```python
+        splitter = SeparatorTextSplitter(chunk_size=800, chunk_overlap=200)
+        chunks = splitter.split_documents(page_docs)
+        ```
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 800,
+        chunk_overlap: int = 200,
+        separators: Sequence[str] = ("\n\n", "\n", ". ", "! ", "? ", " ", ""),
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        # "" means "cut anywhere", which is the hard-cut fallback below
+        self.separators = [s for s in separators if s]
+
+    def _find_break(self, text: str, lo: int, limit: int) -> int:
+        """Position in (lo, limit] where the current chunk should end."""
+        for sep in self.separators:
+            pos = text.rfind(sep, lo + 1, limit)
+            if pos > lo:
+                return pos
+        return limit
+
+    def _overlap_start(self, text: str, start: int, end: int) -> int:
+        """Start of the next chunk: up to chunk_overlap chars back, on a word boundary."""
+        if self.chunk_overlap <= 0:
+            return end
+        lo = max(start + 1, end - self.chunk_overlap)
+        pos = text.find(" ", lo, end)
+        return end if pos == -1 else pos
+
+    def split_text_with_offsets(self, text: str) -> List[Tuple[int, str]]:
+        """Split text into (start_index, chunk) pairs."""
+        out: List[Tuple[int, str]] = []
+        n = len(text)
+        start = 0
+        prev_end = 0
+        while start < n:
+            limit = start + self.chunk_size
+            # Each chunk must end past the previous one, or the overlap would
+            # re-emit the same tail
+            end = n if limit >= n else self._find_break(text, max(start, prev_end), limit)
+            prev_end = end
+
+            raw = text[start:end]
+            chunk = raw.strip()
+            if chunk:
+                out.append((start + len(raw) - len(raw.lstrip()), chunk))
+
+            if end >= n:
+                break
+            start = self._overlap_start(text, start, end)
+        return out
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for _, chunk in self.split_text_with_offsets(text)]
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        chunks: List[Document] = []
+        for doc in documents:
+            for start_index, chunk in self.split_text_with_offsets(doc.page_content):
+                metadata = dict(doc.metadata or {})
+                metadata["start_index"] = start_index
+                chunks.append(Document(page_content=chunk, metadata=metadata))
+        return chunks
@@ -93,7 +93,9 @@ function appendLog(job: TextDbBuildJob, chunk: string) {
 
   // Parse simple progress lines:
   // PROGRESS: pdf i/n ...
-  const m = chunk.match(/PROGRESS:\s+pdf\s+(\d+)\/(\d+)\s+(.*)/);
+  // Progress lines are flushed in batches, so report the latest one in the chunk.
+  const matches = [...chunk.matchAll(/PROGRESS:\s+pdf\s+(\d+)\/(\d+)\s+(.*)/g)];
+  const m = matches[matches.length - 1];
   if (m) {
     job.progress = {
       current: parseInt(m[1], 10),